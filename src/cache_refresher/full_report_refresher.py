@@ -1,18 +1,28 @@
+import hashlib
 import json
 import logging
 import os
-import pickle
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Any, Dict, Iterable, Optional
 
+import numpy as np
 import pandas as pd
 import redis
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+from mstr_herald.cache_codec import serialize_dataframe
 from mstr_herald.connection import create_connection
+from mstr_herald.redis_client import redis_client
 from mstr_herald.fetcher_v2 import fetch_report_csv
 from mstr_herald.utils import (
     CACHE_POLICY_DAILY,
     _to_camel_no_tr,
+    get_cube_last_update_time,
     load_config,
     resolve_cache_policy,
 )
@@ -26,22 +36,63 @@ warnings.filterwarnings("ignore", message="Warning: For given format of date*")
 BASE_DIR = os.path.dirname(__file__)
 LOG_FILE = os.path.join(BASE_DIR, "refresh_logs", "refresh_cache.log")
 
-redis_client = redis.Redis(
-    host=os.getenv("REDIS_HOST", "localhost"),
-    port=int(os.getenv("REDIS_PORT", 6379)),
-    db=int(os.getenv("REDIS_DB", 0)),
-    decode_responses=False,
-)
-
 META_SUFFIX = ":meta"
 
 
+def _stringify_agency_columns(df: pd.DataFrame, columns: list) -> None:
+    """Convert numeric agency-code columns to strings in one numpy pass.
+
+    NaNs are preserved; everything else is cast through int so float codes
+    lose their ``.0`` suffix. Works on the whole candidate block at once
+    instead of a Python-level per-element apply.
+    """
+    if not columns:
+        return
+    # Integer columns cannot hold NaN, so they skip the mask entirely.
+    float_cols = []
+    for col in columns:
+        if df[col].dtype.kind == "i":
+            df[col] = df[col].to_numpy().astype(np.int64).astype(str).astype(object)
+        else:
+            float_cols.append(col)
+    if not float_cols:
+        return
+    arr = df[float_cols].to_numpy(dtype=np.float64)
+    mask = ~np.isnan(arr)
+    as_str = np.where(mask, arr, 0).astype(np.int64).astype(str).astype(object)
+    out = np.where(mask, as_str, np.nan)
+    for i, col in enumerate(float_cols):
+        df[col] = out[:, i]
+
+
 def normalize_agency_code_columns(df: pd.DataFrame) -> pd.DataFrame:
     """Convert acente-related numeric columns to strings to avoid float suffixes like 100100.0."""
+    candidates = [
+        col
+        for col in df.columns
+        if ("acente" in col.lower() or "agency" in col.lower())
+        and df[col].dtype.kind in {"i", "f"}
+    ]
+    _stringify_agency_columns(df, candidates)
+    return df
+
+
+def normalize_report_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    """Rename columns to camelCase and fix agency-code columns in one pass.
+
+    Fuses the previous back-to-back column walks (camelCase rename followed by
+    ``normalize_agency_code_columns``) so wide frames are iterated only once.
+    """
+    mapping = {}
+    candidates = []
     for col in df.columns:
-        col_lower = col.lower()
+        new_col = _to_camel_no_tr(col)
+        mapping[col] = new_col
+        col_lower = new_col.lower()
         if ("acente" in col_lower or "agency" in col_lower) and df[col].dtype.kind in {"i", "f"}:
-            df[col] = df[col].apply(lambda x: str(int(x)) if not pd.isna(x) else x)
+            candidates.append(col)
+    _stringify_agency_columns(df, candidates)
+    df.rename(columns=mapping, inplace=True)
     return df
 
 
@@ -49,18 +100,64 @@ def _meta_key(report_name: str) -> str:
     return f"{report_name}{META_SUFFIX}"
 
 
-def get_report_cache_meta(report_name: str) -> Optional[Dict[str, Any]]:
-    """Return cached metadata for a report, if available."""
-    raw = redis_client.get(_meta_key(report_name))
+def _store_snapshot(cache_key: str, df: pd.DataFrame) -> None:
+    """Serialize a snapshot and write it to Redis (run on the store pool).
+
+    A digest of the serialized bytes is stored alongside the blob; when the
+    new payload hashes to the same value the SET is skipped, saving the
+    network transfer for reports whose upstream data did not change.
+    """
+    payload = serialize_dataframe(df)
+    digest = hashlib.blake2b(payload, digest_size=16).digest()
+    hash_key = f"{cache_key}:hash"
+    try:
+        if redis_client.get(hash_key) == digest:
+            logger.info("%s: Snapshot unchanged, skipping Redis write.", cache_key)
+            return
+    except redis.RedisError:
+        pass
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.set(cache_key, payload)
+    pipe.set(hash_key, digest)
+    pipe.execute()
+
+
+def _encode_meta(meta: Dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(meta)
+    return json.dumps(meta).encode("utf-8")
+
+
+def _decode_meta(report_name: str, raw: Optional[bytes]) -> Optional[Dict[str, Any]]:
     if not raw:
         return None
     try:
+        # orjson parses bytes directly - no intermediate str allocation.
+        if orjson is not None:
+            return orjson.loads(raw)
         return json.loads(raw.decode("utf-8"))
-    except (json.JSONDecodeError, UnicodeDecodeError) as exc:
+    except (ValueError, UnicodeDecodeError) as exc:
         logger.warning("Failed to decode cache metadata for %s: %s", report_name, exc)
         return None
 
 
+def get_report_cache_meta(report_name: str) -> Optional[Dict[str, Any]]:
+    """Return cached metadata for a report, if available."""
+    return _decode_meta(report_name, redis_client.get(_meta_key(report_name)))
+
+
+def get_report_cache_meta_many(report_names: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+    """Fetch metadata for several reports in one pipelined round-trip."""
+    names = list(report_names)
+    if not names:
+        return {}
+    pipe = redis_client.pipeline(transaction=False)
+    for name in names:
+        pipe.get(_meta_key(name))
+    raws = pipe.execute()
+    return {name: _decode_meta(name, raw) for name, raw in zip(names, raws)}
+
+
 def refresh_full_reports(report_names: Optional[Iterable[str]] = None) -> Dict[str, Any]:
     """
     Refresh Redis snapshots for reports configured with the ``daily`` cache policy.
@@ -73,23 +170,21 @@ def refresh_full_reports(report_names: Optional[Iterable[str]] = None) -> Dict[s
         A dictionary containing refreshed metadata, skipped entries, and errors.
     """
     config = load_config()
-    daily_reports: Dict[str, Dict[str, Any]] = {
-        name: cfg
-        for name, cfg in config.items()
-        if resolve_cache_policy(cfg) == CACHE_POLICY_DAILY
-    }
 
-    requested = list(report_names) if report_names is not None else list(daily_reports.keys())
     result: Dict[str, Any] = {
-        "requested": requested,
+        "requested": [],
         "refreshed": {},
         "skipped": {},
         "errors": {},
     }
 
     if report_names is not None:
+        # Deduplicate while preserving order; callers (and the admin UI) may
+        # pass duplicates or a one-shot generator. Only the requested names
+        # have their cache policy resolved - no full config scan.
+        requested = list(dict.fromkeys(report_names))
         to_process: Dict[str, Dict[str, Any]] = {}
-        for name in report_names:
+        for name in requested:
             if name not in config:
                 result["errors"].setdefault(name, []).append("Report not defined in configuration.")
                 continue
@@ -99,7 +194,14 @@ def refresh_full_reports(report_names: Optional[Iterable[str]] = None) -> Dict[s
                 continue
             to_process[name] = config[name]
     else:
-        to_process = daily_reports
+        to_process = {
+            name: cfg
+            for name, cfg in config.items()
+            if resolve_cache_policy(cfg) == CACHE_POLICY_DAILY
+        }
+        requested = list(to_process.keys())
+
+    result["requested"] = requested
 
     if not to_process:
         logger.info("No eligible reports found for cache refresh.")
@@ -113,6 +215,7 @@ def refresh_full_reports(report_names: Optional[Iterable[str]] = None) -> Dict[s
             result["errors"].setdefault(name, []).append("MicroStrategy connection unavailable.")
         return result
 
+    store_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-store")
     try:
         for report_name, cfg in to_process.items():
             info_types = [
@@ -126,32 +229,72 @@ def refresh_full_reports(report_names: Optional[Iterable[str]] = None) -> Dict[s
                 result["skipped"][report_name] = "No viz_keys defined for caching."
                 continue
 
+            # Cheap unchanged-data guard: the cube's last update time acts as a
+            # content fingerprint. If it matches what we cached last time, the
+            # whole fetch/normalise/serialise chain can be skipped.
+            fingerprint = None
+            if cfg.get("cube_id"):
+                try:
+                    fingerprint = get_cube_last_update_time(conn, cfg["cube_id"])
+                except Exception as exc:
+                    logger.warning(
+                        "%s: Could not read cube update time, refreshing anyway: %s",
+                        report_name,
+                        exc,
+                    )
+            if fingerprint:
+                previous_meta = get_report_cache_meta(report_name)
+                if (
+                    previous_meta
+                    and previous_meta.get("fingerprint") == fingerprint
+                    and not previous_meta.get("partial")
+                ):
+                    logger.info("%s: Upstream cube unchanged, skipping refresh.", report_name)
+                    result["skipped"][report_name] = "Upstream data unchanged since last refresh."
+                    continue
+
             refreshed_meta = {
                 "report": report_name,
                 "refreshed_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
                 "info_types": {},
                 "cache_policy": CACHE_POLICY_DAILY,
+                "fingerprint": fingerprint,
             }
             errors_for_report: list[str] = []
 
+            # Serialization + compression + Redis SET run on the store pool so
+            # the next fetch_report_csv round-trip overlaps the CPU-bound work.
+            pending: list = []
             for info_type in info_types:
                 cache_key = f"{report_name}:all:{info_type}"
                 try:
                     df = fetch_report_csv(conn, report_name, filters={}, info_type=info_type)
-                    df.columns = [_to_camel_no_tr(c) for c in df.columns]
-                    df = normalize_agency_code_columns(df)
-                    redis_client.set(cache_key, pickle.dumps(df))
+                    df = normalize_report_dataframe(df)
+                    future = store_pool.submit(_store_snapshot, cache_key, df)
+                    pending.append((info_type, cache_key, int(len(df)), list(df.columns), future))
+                except Exception as exc:
+                    logger.error(
+                        "%s: Failed to cache info_type '%s': %s",
+                        report_name,
+                        info_type,
+                        exc,
+                    )
+                    errors_for_report.append(f"{info_type}: {exc}")
+
+            for info_type, cache_key, rows, columns, future in pending:
+                try:
+                    future.result()
                     refreshed_meta["info_types"][info_type] = {
-                        "rows": int(len(df)),
-                        "columns": list(df.columns),
+                        "rows": rows,
+                        "columns": columns,
                         "cache_key": cache_key,
                     }
                     logger.info(
                         "%s: Cached %s data (%d rows, %d columns)",
                         report_name,
                         info_type,
-                        len(df),
-                        len(df.columns),
+                        rows,
+                        len(columns),
                     )
                 except Exception as exc:
                     logger.error(
@@ -164,7 +307,7 @@ def refresh_full_reports(report_names: Optional[Iterable[str]] = None) -> Dict[s
 
             if refreshed_meta["info_types"]:
                 refreshed_meta["partial"] = bool(errors_for_report)
-                redis_client.set(_meta_key(report_name), json.dumps(refreshed_meta))
+                redis_client.set(_meta_key(report_name), _encode_meta(refreshed_meta))
                 result["refreshed"][report_name] = refreshed_meta
             else:
                 result["skipped"][report_name] = "All info types failed to refresh."
@@ -173,6 +316,7 @@ def refresh_full_reports(report_names: Optional[Iterable[str]] = None) -> Dict[s
                 result["errors"][report_name] = errors_for_report
 
     finally:
+        store_pool.shutdown(wait=True)
         try:
             conn.close()
         except Exception:
@@ -3,9 +3,10 @@ from __future__ import annotations
 import logging
 from typing import Any, Dict
 
-from flask import Blueprint, jsonify
+from flask import Blueprint
 
 from cache_refresher.cache_refresher import refresh_daily_caches
+from mstr_herald.responses import json_response
 from cache_refresher.full_report_refresher import get_report_cache_meta
 
 logger = logging.getLogger(__name__)
@@ -24,7 +25,7 @@ def refresh_all_caches():
     """
     summary = refresh_daily_caches()
     status = 200 if summary.get("refreshed") else 202
-    return jsonify(summary), status
+    return json_response(summary, status)
 
 
 @cache_bp.route("/refresh/<report_name>", methods=["GET", "POST"])
@@ -34,7 +35,7 @@ def refresh_single_cache(report_name: str):
     """
     report_name = _normalise_report_arg(report_name)
     if not report_name:
-        return jsonify({"error": "Report name is required."}), 400
+        return json_response({"error": "Report name is required."}, 400)
 
     summary = refresh_daily_caches([report_name])
     refreshed: Dict[str, Any] = summary.get("refreshed", {})
@@ -47,7 +48,7 @@ def refresh_single_cache(report_name: str):
             "report": report_name,
             "meta": refreshed[report_name],
         }
-        return jsonify(payload)
+        return json_response(payload)
 
     if report_name in errors:
         payload = {
@@ -56,7 +57,7 @@ def refresh_single_cache(report_name: str):
             "errors": errors[report_name],
             "meta": get_report_cache_meta(report_name),
         }
-        return jsonify(payload), 400
+        return json_response(payload, 400)
 
     if report_name in skipped:
         payload = {
@@ -65,7 +66,7 @@ def refresh_single_cache(report_name: str):
             "reason": skipped[report_name],
             "meta": get_report_cache_meta(report_name),
         }
-        return jsonify(payload), 409
+        return json_response(payload, 409)
 
     # Fall back to returning existing metadata if nothing was done
     payload = {
@@ -73,7 +74,7 @@ def refresh_single_cache(report_name: str):
         "report": report_name,
         "meta": get_report_cache_meta(report_name),
     }
-    return jsonify(payload), 404
+    return json_response(payload, 404)
 
 
 @cache_bp.route("/refresh/meta/<report_name>", methods=["GET"])
@@ -83,9 +84,9 @@ def fetch_cache_meta(report_name: str):
     """
     report_name = _normalise_report_arg(report_name)
     if not report_name:
-        return jsonify({"error": "Report name is required."}), 400
+        return json_response({"error": "Report name is required."}, 400)
 
     meta = get_report_cache_meta(report_name)
     if meta is None:
-        return jsonify({"report": report_name, "meta": None}), 404
-    return jsonify({"report": report_name, "meta": meta})
+        return json_response({"report": report_name, "meta": None}, 404)
+    return json_response({"report": report_name, "meta": meta})
@@ -4,11 +4,15 @@ import html
 from typing import Any, Dict, Optional
 import json
 import logging
+import os
 
 import yaml
-from flask import Blueprint, Response, jsonify, request
+from flask import Blueprint, Response, render_template, request
 
-from mstr_herald.connection import create_connection
+from requests.exceptions import HTTPError
+
+from mstr_herald.connection_pool import get_connection, invalidate_connection
+from mstr_herald.responses import json_response
 from mstr_herald.dossier_inspector import discover_dossier
 from mstr_herald.utils import (
     load_config,
@@ -17,11 +21,35 @@ from mstr_herald.utils import (
     CACHE_POLICY_NONE,
     CACHE_POLICY_DAILY,
 )
-from cache_refresher.full_report_refresher import get_report_cache_meta
+from cache_refresher.full_report_refresher import get_report_cache_meta, get_report_cache_meta_many
 
 
 logger = logging.getLogger(__name__)
 
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "config", "dossiers.yaml")
+
+_SafeDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+# Rendered-YAML cache keyed on the config file's mtime so admin page loads do
+# not re-serialize an unchanged configuration.
+_YAML_CACHE: Dict[str, Any] = {"mtime": None, "text": None}
+
+
+def _config_yaml() -> str:
+    """Return the current configuration as YAML, re-dumping only on change."""
+    try:
+        mtime = os.stat(CONFIG_PATH).st_mtime_ns
+    except OSError:
+        mtime = None
+    if mtime is None or _YAML_CACHE["mtime"] != mtime:
+        config = load_config() or {}
+        _YAML_CACHE["text"] = yaml.dump(
+            config, Dumper=_SafeDumper, allow_unicode=True, default_flow_style=False,
+            sort_keys=False
+        )
+        _YAML_CACHE["mtime"] = mtime
+    return _YAML_CACHE["text"]
+
 
 def _format_cache_status(meta: Optional[Dict[str, Any]]) -> str:
     if not meta:
@@ -49,6 +77,15 @@ configure_bp = Blueprint("configure", __name__)
 
 def _generate_edit_rows(config: Dict[str, Any]) -> str:
     rows: list[str] = []
+    # Tek pipeline turu: rapor başına ayrı Redis GET yerine tüm metalar
+    # bir seferde çekilir.
+    meta_by_report: Dict[str, Any] = {}
+    meta_fetch_failed = False
+    try:
+        meta_by_report = get_report_cache_meta_many((config or {}).keys())
+    except Exception as exc:  # pragma: no cover - safety net for Redis outages
+        logger.warning("Failed to load cache metadata: %s", exc)
+        meta_fetch_failed = True
     for report_name, cfg in (config or {}).items():
         cfg = cfg or {}
         filters = cfg.get("filters") or {}
@@ -66,13 +103,8 @@ def _generate_edit_rows(config: Dict[str, Any]) -> str:
             selected = "selected" if current_policy == value else ""
             options.append(f"<option value='{value}' {selected}>{html.escape(label)}</option>")
 
-        meta_error = ""
-        try:
-            meta = get_report_cache_meta(report_name)
-        except Exception as exc:  # pragma: no cover - safety net for Redis outages
-            logger.warning("Failed to load cache metadata for %s: %s", report_name, exc)
-            meta = None
-            meta_error = "Unavailable"
+        meta_error = "Unavailable" if meta_fetch_failed else ""
+        meta = meta_by_report.get(report_name)
 
         status_text = "Cache metadata unavailable" if meta_error else _format_cache_status(meta)
         meta_json = html.escape(json.dumps(meta) if meta is not None else "", quote=True)
@@ -396,7 +428,7 @@ def edit_dossiers() -> Response:
 def save_dossiers():
     payload = request.get_json(silent=True)
     if not isinstance(payload, dict):
-        return jsonify({"status": "error", "error": "Invalid payload"}), 400
+        return json_response({"status": "error", "error": "Invalid payload"}, 400)
 
     normalised: Dict[str, Any] = {}
     for report, cfg in payload.items():
@@ -413,158 +445,26 @@ def save_dossiers():
     try:
         save_config(normalised)
     except Exception as exc:
-        return jsonify({"status": "error", "error": str(exc)}), 500
+        return json_response({"status": "error", "error": str(exc)}, 500)
 
-    return jsonify({"status": "ok"})
+    return json_response({"status": "ok"})
 
 
-@configure_bp.route("/admin/configure", methods=["GET"])
-def view_config() -> Response:
-    config = load_config() or {}
-    config_yaml = yaml.safe_dump(config, allow_unicode=True, default_flow_style=False)
 
-    html_content = f'''
-    <html>
-    <head>
-      <meta charset="UTF-8">
-      <title>Dossier Configuration</title>
-      <style>
-        body {{ font-family: sans-serif; padding: 20px; display: flex; gap: 40px; }}
-        .section {{ flex: 1; border: 1px solid #ccc; border-radius: 8px; padding: 16px; background: #f9f9f9; }}
-        pre {{ background: #eee; padding: 8px; border-radius: 4px; max-height: 300px; overflow-y: auto; }}
-        input, select {{ width: 100%; padding: 6px; margin-top: 4px; margin-bottom: 8px; box-sizing: border-box; }}
-        button {{ padding: 6px 12px; margin-top: 8px; }}
-        .message {{ margin-top: 10px; }}
-        #discover-result {{ white-space: pre-wrap; font-family: monospace; background: #f4f4f4; padding: 10px; border-radius: 5px; border: 1px solid #ddd; max-height: 300px; overflow-y: auto; margin-top: 12px; }}
-      </style>
-      <script>
-        document.addEventListener("DOMContentLoaded", () => {{
-          const saveForm = document.getElementById("save-form");
-          const saveMsg = document.getElementById("save-message");
-          const deleteForm = document.getElementById("delete-form");
-          const deleteMsg = document.getElementById("delete-message");
-
-          saveForm.addEventListener("submit", async (event) => {{
-            event.preventDefault();
-            const formData = new FormData(saveForm);
-            const data = new URLSearchParams(formData);
-            saveMsg.innerHTML = "⏳ Kaydediliyor...";
-            try {{
-              const res = await fetch("/admin/configure", {{
-                method: "POST",
-                headers: {{ "Content-Type": "application/x-www-form-urlencoded" }},
-                body: data,
-              }});
-              const json = await res.json();
-              saveMsg.innerHTML = res.ok
-                ? `<span style='color:green;'>✔ ${{json.report}} başarıyla kaydedildi.</span>`
-                : `<span style='color:red;'>Hata: ${{json.message || json.error}}</span>`;
-
-              const yamlRes = await fetch("/admin/configure_yaml");
-              const yamlText = await yamlRes.text();
-              document.querySelector("pre").textContent = yamlText;
-            }} catch (err) {{
-              saveMsg.innerHTML = `<span style='color:red;'>Sunucu hatası: ${{err}}</span>`;
-            }}
-          }});
 
-          deleteForm.addEventListener("submit", async (event) => {{
-            event.preventDefault();
-            const formData = new FormData(deleteForm);
-            const data = new URLSearchParams(formData);
-            deleteMsg.innerHTML = "⏳ Siliniyor...";
-            try {{
-              const res = await fetch("/admin/configure/delete", {{
-                method: "POST",
-                headers: {{ "Content-Type": "application/x-www-form-urlencoded" }},
-                body: data,
-              }});
-              const json = await res.json();
-              deleteMsg.innerHTML = res.ok
-                ? `<span style='color:green;'>✔ ${{json.report}} silindi.</span>`
-                : `<span style='color:red;'>Hata: ${{json.message || json.error}}</span>`;
-
-              const yamlRes = await fetch("/admin/configure_yaml");
-              const yamlText = await yamlRes.text();
-              document.querySelector("pre").textContent = yamlText;
-            }} catch (err) {{
-              deleteMsg.innerHTML = `<span style='color:red;'>Sunucu hatası: ${{err}}</span>`;
-            }}
-          }});
-
-          window.discoverKeys = async function(event) {{
-            event.preventDefault();
-            const dossierId = document.getElementById("dossier_id_discover").value;
-            const resultBox = document.getElementById("discover-result");
-            resultBox.textContent = "Loading...";
-            try {{
-              const res = await fetch("/admin/discover_json", {{
-                method: "POST",
-                headers: {{ "Content-Type": "application/json" }},
-                body: JSON.stringify({{ dossier_id: dossierId }})
-              }});
-              const json = await res.json();
-              resultBox.textContent = JSON.stringify(json, null, 2);
-              const acenteFilter = (json.filters || []).find(f => (f.name || '').toLowerCase() === 'acente_kodu');
-              if (acenteFilter) {{
-                document.querySelector("[name='filter_agency_name']").value = acenteFilter.key || '';
-              }}
-              const viz1 = json.visualizations?.[0];
-              const viz2 = json.visualizations?.[1];
-              if (viz1) {{
-                document.querySelector("[name='viz_summary']").value = viz1.key || '';
-              }}
-              if (viz2) {{
-                document.querySelector("[name='viz_detail']").value = viz2.key || '';
-              }}
-            }} catch (e) {{
-              resultBox.textContent = "Hata: " + e;
-            }}
-          }}
-        }});
-      </script>
-    </head>
-    <body>
-      <div class='section'>
-        <h2>Mevcut Yapılandırma</h2>
-        <pre>{html.escape(config_yaml)}</pre>
-        <h3>Discover Keys</h3>
-        <form onsubmit='discoverKeys(event)'>
-          <input id='dossier_id_discover' placeholder='dossier id'>
-          <button type='submit'>Discover</button>
-        </form>
-        <div id='discover-result'></div>
-      </div>
-      <div class='section'>
-        <h3>Dossier Güncelle</h3>
-        <form id='save-form'>
-          <label>Report Name:</label><input name='report_name'>
-          <label>Dossier ID:</label><input name='dossier_id'>
-          <label>Cube ID:</label><input name='cube_id'>
-          <label>Summary Viz Key:</label><input name='viz_summary'>
-          <label>Detail Viz Key:</label><input name='viz_detail'>
-          <label>Agency Filter Key (acente_kodu):</label><input name='filter_agency_name'>
-          <label>Cache Policy:</label>
-          <select name='cache_policy'>
-            <option value='{CACHE_POLICY_NONE}'>No Cache</option>
-            <option value='{CACHE_POLICY_DAILY}'>Daily (refresh via job)</option>
-          </select>
-          <button type='submit'>Kaydet</button>
-        </form>
-        <div id='save-message' class='message'></div>
-
-        <h3>Dossier Sil</h3>
-        <form id='delete-form'>
-          <input name='report_name' placeholder='report name'>
-          <button type='submit'>Sil</button>
-        </form>
-        <div id='delete-message' class='message'></div>
-      </div>
-    </body>
-    </html>
-    '''
-
-    return Response(html_content, content_type="text/html; charset=utf-8")
+@configure_bp.route("/admin/configure", methods=["GET"])
+def view_config() -> Response:
+    # Jinja compiles and caches the template once; only the YAML dump
+    # (itself mtime-cached) varies per request. Autoescaping covers it.
+    return Response(
+        render_template(
+            "configure.html",
+            config_yaml=_config_yaml(),
+            cache_policy_none=CACHE_POLICY_NONE,
+            cache_policy_daily=CACHE_POLICY_DAILY,
+        ),
+        content_type="text/html; charset=utf-8",
+    )
 
 
 @configure_bp.route("/admin/configure", methods=["POST"])
@@ -579,7 +479,7 @@ def add_or_update_config():
         cache_policy = CACHE_POLICY_NONE
 
     if not all([report_name, dossier_id, cube_id]):
-        return jsonify({"error": "report_name, dossier_id and cube_id are required"}), 400
+        return json_response({"error": "report_name, dossier_id and cube_id are required"}, 400)
 
     summary_viz = data.get("viz_summary") or None
     detail_viz = data.get("viz_detail") or None
@@ -602,7 +502,7 @@ def add_or_update_config():
     config[report_name] = new_entry
     save_config(config)
 
-    return jsonify({"status": "saved", "report": report_name})
+    return json_response({"status": "saved", "report": report_name})
 
 
 @configure_bp.route("/admin/configure/delete", methods=["POST"])
@@ -611,33 +511,39 @@ def delete_config():
     report_name = data.get("report_name")
 
     if not report_name:
-        return jsonify({"error": "report_name required"}), 400
+        return json_response({"error": "report_name required"}, 400)
 
     config = load_config() or {}
     if report_name not in config:
-        return jsonify({"error": "report not found"}), 404
+        return json_response({"error": "report not found"}, 404)
 
     del config[report_name]
     save_config(config)
-    return jsonify({"status": "deleted", "report": report_name})
+    return json_response({"status": "deleted", "report": report_name})
+
+
+def _discover_with_pooled_connection(dossier_id: str) -> dict:
+    """Run discover_dossier on the pooled connection, re-logging in on 401."""
+    conn = get_connection()
+    try:
+        return discover_dossier(conn, dossier_id)
+    except HTTPError as exc:
+        if exc.response is None or exc.response.status_code != 401:
+            raise
+        invalidate_connection()
+        return discover_dossier(get_connection(), dossier_id)
 
 
 @configure_bp.route("/admin/discover", methods=["GET"])
 def discover():
     dossier_id = request.args.get("dossier_id")
     if not dossier_id:
-        return jsonify({"error": "dossier_id required"}), 400
+        return json_response({"error": "dossier_id required"}, 400)
     try:
-        conn = create_connection()
-        info = discover_dossier(conn, dossier_id)
+        info = _discover_with_pooled_connection(dossier_id)
     except Exception as exc:
-        return jsonify({"error": str(exc)}), 500
-    finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
-    return jsonify(info)
+        return json_response({"error": str(exc)}, 500)
+    return json_response(info)
 
 
 @configure_bp.route("/admin/discover_json", methods=["POST"])
@@ -645,22 +551,14 @@ def discover_json():
     payload = request.get_json(silent=True) or {}
     dossier_id = payload.get("dossier_id")
     if not dossier_id:
-        return jsonify({"error": "dossier_id required"}), 400
+        return json_response({"error": "dossier_id required"}, 400)
     try:
-        conn = create_connection()
-        info = discover_dossier(conn, dossier_id)
+        info = _discover_with_pooled_connection(dossier_id)
     except Exception as exc:
-        return jsonify({"error": str(exc)}), 500
-    finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
-    return jsonify(info)
+        return json_response({"error": str(exc)}, 500)
+    return json_response(info)
 
 
 @configure_bp.route("/admin/configure_yaml", methods=["GET"])
 def get_config_yaml():
-    config = load_config() or {}
-    config_yaml = yaml.safe_dump(config, allow_unicode=True, default_flow_style=False)
-    return Response(config_yaml, content_type="text/plain; charset=utf-8")
+    return Response(_config_yaml(), content_type="text/plain; charset=utf-8")
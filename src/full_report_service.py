@@ -1,51 +1,69 @@
-import logging
-import time
-from datetime import datetime
-from cache_refresher.full_report_refresher import refresh_full_reports
-import os
-import warnings
-
-
-BASE_DIR = os.path.dirname(__file__)
-LOG_FILE = os.path.join(BASE_DIR, "refresh_cache.log")
-
-SKIP_HOURS = [0, 1, 2, 3, 4, 5, 18, 20, 21, 22, 23]
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(LOG_FILE,mode='w', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
-logger = logging.getLogger(__name__)
-logging.getLogger("py.warnings").setLevel(logging.ERROR)
-def run_service(interval_seconds: int = 120) -> None:
-    while True:
-        now = datetime.now()
-        if now.hour in SKIP_HOURS:
-            logging.info(f"Skipping full refresh at hour {now.hour}")
-            time.sleep(interval_seconds)
-            continue
-
-        logging.info("Starting full report refresh")
-        try:
-            refresh_full_reports()
-        except Exception as e:
-            logging.error(f"Full report refresh failed: {e}")
-        logging.info(f"Sleeping for {interval_seconds} seconds")
-        time.sleep(interval_seconds)
-
-if __name__ == "__main__":
-    warnings.filterwarnings("ignore", message="Warning: For given format of date*")
-    logging.captureWarnings(True)
-
-    logging.basicConfig(
-        level=logging.INFO,
-        filename=LOG_FILE,
-        filemode='a'
-    )
-
-    logging.info("Starting Full Report Refresh Service")
-    run_service()
+import logging
+import time
+from datetime import datetime, timedelta
+from cache_refresher.full_report_refresher import refresh_full_reports
+import os
+import warnings
+
+
+BASE_DIR = os.path.dirname(__file__)
+LOG_FILE = os.path.join(BASE_DIR, "refresh_cache.log")
+
+SKIP_HOURS = frozenset({0, 1, 2, 3, 4, 5, 18, 20, 21, 22, 23})
+
+# 24-bit maske: saat testi tek tamsayı işlemi olur.
+SKIP_MASK = 0
+for _h in SKIP_HOURS:
+    SKIP_MASK |= 1 << _h
+
+
+def _next_active_hour(now: datetime) -> datetime:
+    """Return the start of the next hour not covered by SKIP_HOURS."""
+    nxt = now.replace(minute=0, second=0, microsecond=0)
+    while True:
+        nxt += timedelta(hours=1)
+        if not SKIP_MASK & (1 << nxt.hour):
+            return nxt
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler(LOG_FILE,mode='w', encoding='utf-8'),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger(__name__)
+logging.getLogger("py.warnings").setLevel(logging.ERROR)
+def run_service(interval_seconds: int = 120) -> None:
+    while True:
+        now = datetime.now()
+        if SKIP_MASK & (1 << now.hour):
+            # Skip penceresi boyunca her interval'de uyanmak yerine bir
+            # sonraki aktif saate kadar tek seferde uyu.
+            next_run = _next_active_hour(now)
+            sleep_s = max(1.0, (next_run - now).total_seconds())
+            logging.info(f"Skipping full refresh, sleeping {sleep_s:.0f}s until {next_run}")
+            time.sleep(sleep_s)
+            continue
+
+        logging.info("Starting full report refresh")
+        try:
+            refresh_full_reports()
+        except Exception as e:
+            logging.error(f"Full report refresh failed: {e}")
+        logging.info(f"Sleeping for {interval_seconds} seconds")
+        time.sleep(interval_seconds)
+
+if __name__ == "__main__":
+    warnings.filterwarnings("ignore", message="Warning: For given format of date*")
+    logging.captureWarnings(True)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        filename=LOG_FILE,
+        filemode='a'
+    )
+
+    logging.info("Starting Full Report Refresh Service")
+    run_service()
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""Serialization helpers for DataFrames cached in Redis.
+
+Every blob written through :func:`serialize_dataframe` is prefixed with a
+single format-tag byte so readers can tell how it was produced. When pyarrow
+is installed, frames are written as Arrow IPC streams (columnar buffers, no
+per-row Python objects); otherwise they are pickled. Either payload is
+compressed with zstd level 1 when the ``zstandard`` library is available.
+Blobs written before tagging was introduced are still readable.
+"""
+import pickle
+
+try:
+    import zstandard as zstd
+except ImportError:  # pragma: no cover - optional dependency
+    zstd = None
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+# One-byte format tags prepended to every cached blob.
+TAG_PICKLE = b"\x00"
+TAG_PICKLE_ZSTD = b"\x01"
+TAG_ARROW = b"\x02"
+TAG_ARROW_ZSTD = b"\x03"
+
+_ZSTD_LEVEL = 1
+
+
+def _arrow_serialize(df) -> bytes:
+    sink = pa.BufferOutputStream()
+    table = pa.Table.from_pandas(df)
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _arrow_deserialize(payload: bytes):
+    return pa.ipc.open_stream(pa.BufferReader(payload)).read_all().to_pandas()
+
+
+def serialize_dataframe(df) -> bytes:
+    """Encode a DataFrame as Arrow IPC (or pickle), zstd-compressed when possible."""
+    payload = None
+    if pa is not None:
+        try:
+            payload = _arrow_serialize(df)
+            tag_plain, tag_zstd = TAG_ARROW, TAG_ARROW_ZSTD
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+            payload = None
+    if payload is None:
+        payload = pickle.dumps(df)
+        tag_plain, tag_zstd = TAG_PICKLE, TAG_PICKLE_ZSTD
+
+    if zstd is not None:
+        compressor = zstd.ZstdCompressor(level=_ZSTD_LEVEL, threads=-1)
+        return tag_zstd + compressor.compress(payload)
+    return tag_plain + payload
+
+
+def deserialize_dataframe(blob: bytes):
+    """Restore a DataFrame written by :func:`serialize_dataframe`.
+
+    Untagged blobs (written before compression support) are loaded as plain
+    pickle for backwards compatibility.
+    """
+    tag = blob[:1]
+    if tag in (TAG_PICKLE_ZSTD, TAG_ARROW_ZSTD):
+        if zstd is None:
+            raise RuntimeError(
+                "Cached blob is zstd-compressed but zstandard is not installed."
+            )
+        payload = zstd.ZstdDecompressor().decompress(blob[1:])
+    elif tag in (TAG_PICKLE, TAG_ARROW):
+        payload = blob[1:]
+    else:
+        # Legacy entry without a format tag.
+        return pickle.loads(blob)
+
+    if tag in (TAG_ARROW, TAG_ARROW_ZSTD):
+        if pa is None:
+            raise RuntimeError(
+                "Cached blob is Arrow-encoded but pyarrow is not installed."
+            )
+        return _arrow_deserialize(payload)
+    return pickle.loads(payload)
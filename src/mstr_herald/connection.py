@@ -1,20 +1,37 @@
-from dotenv import load_dotenv
-import os
-from mstrio.connection import Connection
-
-load_dotenv()
-
-def create_connection() -> Connection:
-    """Establish and return a MicroStrategy connection."""
-    base_url = os.getenv("MSTR_URL_API")
-    username = os.getenv("MSTR_USERNAME")
-    password = os.getenv("MSTR_PASSWORD")
-    project = os.getenv("MSTR_PROJECT")
-
-    return Connection(
-        base_url,
-        username,
-        password,
-        login_mode=1,
-        project_name=project
-    )
+from dotenv import load_dotenv
+import os
+from mstrio.connection import Connection
+from requests.adapters import HTTPAdapter, Retry
+
+load_dotenv()
+
+def create_connection() -> Connection:
+    """Establish and return a MicroStrategy connection."""
+    base_url = os.getenv("MSTR_URL_API")
+    username = os.getenv("MSTR_USERNAME")
+    password = os.getenv("MSTR_PASSWORD")
+    project = os.getenv("MSTR_PROJECT")
+
+    conn = Connection(
+        base_url,
+        username,
+        password,
+        login_mode=1,
+        project_name=project
+    )
+
+    # Polling döngüleri saniyede birkaç POST atar; adapter havuzu olmadan
+    # her istek yeni TCP+TLS el sıkışması (~100ms) ödeyebilir. Havuzu
+    # büyütüp keep-alive'ı açık tutarak tek soket üzerinden devam ederiz.
+    session = getattr(conn, "session", None) or getattr(conn, "_session", None)
+    if session is not None:
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=64,
+            max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504]),
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers["Connection"] = "keep-alive"
+
+    return conn
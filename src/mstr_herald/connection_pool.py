@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""Per-thread reuse of MicroStrategy connections.
+
+create_connection() performs a full REST /auth/login round-trip, which
+dominates wall time for short admin calls like /admin/discover. Keeping
+one long-lived Connection per worker thread turns those calls into pure
+discover work; callers re-login only when the session has gone stale.
+"""
+import threading
+
+from mstr_herald.connection import create_connection
+
+_local = threading.local()
+
+
+def _is_dead(conn) -> bool:
+    """Best-effort liveness check for a pooled connection."""
+    try:
+        status = conn.status()
+    except Exception:
+        return True
+    return not status
+
+
+def get_connection():
+    """Return this thread's cached connection, logging in when needed."""
+    conn = getattr(_local, "conn", None)
+    if conn is None or _is_dead(conn):
+        conn = create_connection()
+        _local.conn = conn
+    return conn
+
+
+def invalidate_connection() -> None:
+    """Drop the cached connection so the next call re-logs in.
+
+    Call this after a 401 from the REST API: the session expired
+    server-side even though the local object still looks healthy.
+    """
+    conn = getattr(_local, "conn", None)
+    _local.conn = None
+    if conn is not None:
+        try:
+            conn.close()
+        except Exception:
+            pass
@@ -1,87 +1,131 @@
-from __future__ import annotations
-
-from typing import Any, Dict, List
-from mstrio.connection import Connection
-
-
-def post_dossier_instance(conn: Connection, dossier_id: str) -> dict:
-    """Create a dossier instance and return JSON."""
-    res = conn.post(f"{conn.base_url}/api/dossiers/{dossier_id}/instances")
-    res.raise_for_status()
-    return res.json()
-
-
-def get_dossier_instance_def(conn: Connection, dossier_id: str, instance_id: str) -> dict:
-    """Fetch dossier definition JSON."""
-    res = conn.get(
-        f"{conn.base_url}/api/v2/dossiers/{dossier_id}/instances/{instance_id}/definition"
-    )
-    res.raise_for_status()
-    return res.json()
-
-
-def list_filter_keys(def_json: dict) -> List[Dict[str, Any]]:
-    """Return list of dictionaries describing filters and selectors."""
-    rows: list[dict] = []
-
-    def walk(node: Any, path: str = "root") -> None:
-        if isinstance(node, dict):
-            for coll, typ in (("filters", "filter"), ("selectors", "selector")):
-                for idx, item in enumerate(node.get(coll, []) or []):
-                    rows.append(
-                        {
-                            "path": f"{path}/{coll}[{idx}]",
-                            "key": item.get("key"),
-                            "name": item.get("name"),
-                            "type": typ,
-                        }
-                    )
-            for k, v in node.items():
-                if isinstance(v, (dict, list)):
-                    walk(v, f"{path}/{k}")
-        elif isinstance(node, list):
-            for i, el in enumerate(node):
-                walk(el, f"{path}[{i}]")
-
-    walk(def_json)
-    return rows
-
-
-def list_visualization_keys(def_json: dict) -> List[Dict[str, str]]:
-    """Return list of visualization key/name info from dossier definition."""
-    result: list[dict] = []
-    for ch in def_json.get("chapters", []) or []:
-        ch_name = ch.get("name")
-        for pg in ch.get("pages", []) or []:
-            pg_name = pg.get("name")
-            for viz in pg.get("visualizations", []) or []:
-                result.append(
-                    {
-                        "chapter": ch_name,
-                        "page": pg_name,
-                        "key": viz.get("key"),
-                        "name": viz.get("name"),
-                    }
-                )
-    return result
-
-
-def discover_dossier(conn: Connection, dossier_id: str) -> dict:
-    """Return filtered visualization and agency_code filter info for a given dossier."""
-    inst = post_dossier_instance(conn, dossier_id)
-    mid = inst.get("mid")
-    def_json = get_dossier_instance_def(conn, dossier_id, mid)
-
-    visualizations = list_visualization_keys(def_json)
-
-    # Only keep the filter where name == 'acente_kodu'
-    filters = [
-        f for f in list_filter_keys(def_json)
-        if (f.get("name") or "").strip().lower() == "acente_kodu"
-    ]
-
-    return {
-        "visualizations": visualizations,
-        "filters": filters
-    }
-
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, List
+from mstrio.connection import Connection
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+# Definition JSON is invariant per dossier version; cache it per worker so
+# repeated admin "Discover" clicks skip the instance POST + definition GET.
+_DEF_CACHE_TTL_S = 300.0
+_DEF_CACHE: Dict[str, tuple] = {}
+_DEF_CACHE_LOCK = threading.Lock()
+
+
+def _loads(res) -> dict:
+    """Parse a REST response body, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(res.content)
+    return res.json()
+
+
+def post_dossier_instance(conn: Connection, dossier_id: str) -> dict:
+    """Create a dossier instance and return JSON."""
+    res = conn.post(f"{conn.base_url}/api/dossiers/{dossier_id}/instances")
+    res.raise_for_status()
+    return _loads(res)
+
+
+def get_dossier_instance_def(conn: Connection, dossier_id: str, instance_id: str) -> dict:
+    """Fetch dossier definition JSON."""
+    res = conn.get(
+        f"{conn.base_url}/api/v2/dossiers/{dossier_id}/instances/{instance_id}/definition"
+    )
+    res.raise_for_status()
+    return _loads(res)
+
+
+def _get_definition_cached(conn: Connection, dossier_id: str) -> dict:
+    """Return the dossier definition, creating an instance only on cache miss."""
+    now = time.monotonic()
+    with _DEF_CACHE_LOCK:
+        entry = _DEF_CACHE.get(dossier_id)
+        if entry is not None and now - entry[0] < _DEF_CACHE_TTL_S:
+            return entry[1]
+
+    inst = post_dossier_instance(conn, dossier_id)
+    mid = inst.get("mid")
+    def_json = get_dossier_instance_def(conn, dossier_id, mid)
+
+    with _DEF_CACHE_LOCK:
+        _DEF_CACHE[dossier_id] = (now, def_json)
+    return def_json
+
+
+def list_filter_keys(def_json: dict, name_filter: str | None = None) -> List[Dict[str, Any]]:
+    """Return list of dictionaries describing filters and selectors.
+
+    The definition JSON is traversed iteratively with an explicit stack so
+    large dossiers do not pay per-node recursion frames; path strings are
+    only joined for nodes that actually yield a row. When ``name_filter``
+    (a lowercased name) is given, only matching rows are constructed.
+    """
+    rows: list[dict] = []
+    stack: list[tuple[Any, tuple[str, ...]]] = [(def_json, ())]
+
+    while stack:
+        node, path = stack.pop()
+        if isinstance(node, dict):
+            for coll, typ in (("filters", "filter"), ("selectors", "selector")):
+                for idx, item in enumerate(node.get(coll) or ()):
+                    if name_filter is not None:
+                        nm = (item.get("name") or "").strip().lower()
+                        if nm != name_filter:
+                            continue
+                    rows.append(
+                        {
+                            "path": "/".join(("root",) + path + (f"{coll}[{idx}]",)),
+                            "key": item.get("key"),
+                            "name": item.get("name"),
+                            "type": typ,
+                        }
+                    )
+            for k, v in node.items():
+                if isinstance(v, (dict, list)):
+                    stack.append((v, path + (k,)))
+        elif isinstance(node, list):
+            for i, el in enumerate(node):
+                if isinstance(el, (dict, list)):
+                    stack.append((el, path + (f"[{i}]",)))
+
+    return rows
+
+
+def list_visualization_keys(def_json: dict) -> List[Dict[str, str]]:
+    """Return list of visualization key/name info from dossier definition."""
+    result: list[dict] = []
+    for ch in def_json.get("chapters", []) or []:
+        ch_name = ch.get("name")
+        for pg in ch.get("pages", []) or []:
+            pg_name = pg.get("name")
+            for viz in pg.get("visualizations", []) or []:
+                result.append(
+                    {
+                        "chapter": ch_name,
+                        "page": pg_name,
+                        "key": viz.get("key"),
+                        "name": viz.get("name"),
+                    }
+                )
+    return result
+
+
+def discover_dossier(conn: Connection, dossier_id: str) -> dict:
+    """Return filtered visualization and agency_code filter info for a given dossier."""
+    def_json = _get_definition_cached(conn, dossier_id)
+
+    visualizations = list_visualization_keys(def_json)
+
+    # Only keep the filter where name == 'acente_kodu'
+    filters = list_filter_keys(def_json, name_filter="acente_kodu")
+
+    return {
+        "visualizations": visualizations,
+        "filters": filters
+    }
+
@@ -1,81 +1,177 @@
-import pandas as pd
-from datetime import datetime
-from typing import Optional
-
-# Tarih aralığı filtresi uygulanacak kolonlar
-DATE_COLUMN_LIST = [
-    "policeOnayTarih", "policeBaslangicTarihi", "policeBitisTarihi",
-    "teklifGecerlilikBitisTarih", "policeVadeBaslangic", "policeVadeBitis",
-    "ihbarTarihi", "hasarTarihi", "acenteKurulusTarihi", "confirmDate", 
-    "polBegDate", "polEndDate", "begDate", "endDate", "propValidBegDate", 
-    "propValidEndDate", "policeTanzimTarihi", "girisTarihi", "sonKullanmaTarihi",
-    "vadeTarihi", "kapanisTarihi", "enSonMuallakTarihi", "policeBaslangic",
-    "policeBitis"
-]
-
-def _parse_date(date_str: Optional[str]) -> Optional[datetime]:
-    try:
-        return datetime.strptime(date_str, "%m/%d/%Y") if date_str else None
-    except ValueError:
-        try:
-            return pd.to_datetime(date_str, errors='coerce')
-        except Exception:
-            return None
-
-def _filter_exact(df: pd.DataFrame, column: str, value) -> pd.DataFrame:
-    if column not in df.columns:
-        return df
-
-    col_dtype = df[column].dtype
-    try:
-        if pd.api.types.is_numeric_dtype(col_dtype):
-            value = float(value)
-        elif pd.api.types.is_datetime64_any_dtype(col_dtype):
-            value = _parse_date(value)
-        return df[df[column] == value]
-    except Exception:
-        return df
-
-def _filter_date_range(df: pd.DataFrame, column: str, start_date: Optional[str], end_date: Optional[str]) -> pd.DataFrame:
-    if column not in df.columns:
-        return df
-
-    dt_series = pd.to_datetime(df[column], errors='coerce')
-    start = _parse_date(start_date)
-    end = _parse_date(end_date)
-
-    mask = pd.Series([True] * len(df), index=df.index)
-    if start:
-        mask &= dt_series >= start
-    if end:
-        mask &= dt_series <= end
-
-    return df[mask]
-
-def apply_filters(df: pd.DataFrame, filters: dict) -> pd.DataFrame:
-    df_result = df.copy()
-    filters = {k.lower(): v for k, v in filters.items()}
-
-    # 1. DATE_COLUMN_LIST için [_beg_date, _end_date] kontrol et
-    for col in DATE_COLUMN_LIST:
-        col_lower = col.lower()
-        beg_key = f"{col_lower}_beg_date"
-        end_key = f"{col_lower}_end_date"
-        beg_val = filters.get(beg_key)
-        end_val = filters.get(end_key)
-        if beg_val or end_val:
-            if col in df_result.columns:
-                df_result = _filter_date_range(df_result, col, beg_val, end_val)
-
-    # Diğer filtreleri doğrudan kolon adı eşleşmesiyle uygula
-    excluded_keys = {f"{col.lower()}_beg_date" for col in DATE_COLUMN_LIST}
-    excluded_keys |= {f"{col.lower()}_end_date" for col in DATE_COLUMN_LIST}
-
-    for key, value in filters.items():
-        if key in excluded_keys:
-            continue
-        for col in df_result.columns:
-            if col.lower() == key:
-                df_result = _filter_exact(df_result, col, value)
-
-    return df_result
\ No newline at end of file
+import weakref
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Optional
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - optional accelerator
+    njit = None
+
+try:
+    import ciso8601
+except ImportError:  # pragma: no cover - optional dependency
+    ciso8601 = None
+
+_I8_MIN = np.iinfo(np.int64).min  # datetime64 NaT'ın i8 görünümü
+_I8_MAX = np.iinfo(np.int64).max
+
+if njit is not None:
+    # İmzalar baştan verilir: ilk istekte JIT beklenmez, derleme import'ta
+    # yapılır ve cache=True ile diskten geri yüklenir.
+    @njit("void(int64[:], int64, int64, boolean[:])", cache=True, parallel=False)
+    def _date_range_mask_i8(arr, lo, hi, out):  # pragma: no cover - compiled
+        for i in range(arr.shape[0]):
+            v = arr[i]
+            if v == _I8_MIN or v < lo or v > hi:
+                out[i] = False
+
+    @njit("void(float64[:], float64, boolean[:])", cache=True, parallel=False)
+    def _eq_mask_f64(arr, val, out):  # pragma: no cover - compiled
+        for i in range(arr.shape[0]):
+            if arr[i] != val:
+                out[i] = False
+else:
+    _date_range_mask_i8 = None
+    _eq_mask_f64 = None
+
+# Tarih aralığı filtresi uygulanacak kolonlar
+DATE_COLUMN_LIST = [
+    "policeOnayTarih", "policeBaslangicTarihi", "policeBitisTarihi",
+    "teklifGecerlilikBitisTarih", "policeVadeBaslangic", "policeVadeBitis",
+    "ihbarTarihi", "hasarTarihi", "acenteKurulusTarihi", "confirmDate", 
+    "polBegDate", "polEndDate", "begDate", "endDate", "propValidBegDate", 
+    "propValidEndDate", "policeTanzimTarihi", "girisTarihi", "sonKullanmaTarihi",
+    "vadeTarihi", "kapanisTarihi", "enSonMuallakTarihi", "policeBaslangic",
+    "policeBitis"
+]
+
+@lru_cache(maxsize=1024)
+def _parse_date(date_str: Optional[str]) -> Optional[datetime]:
+    if not date_str:
+        return None
+    # ciso8601 ISO biçimlerini C hızında çözer; istek parametreleri çok
+    # tekrarlandığı için sonuçlar lru_cache ile de saklanır.
+    if ciso8601 is not None:
+        try:
+            return ciso8601.parse_datetime(date_str)
+        except ValueError:
+            pass
+    try:
+        return datetime.strptime(date_str, "%m/%d/%Y")
+    except ValueError:
+        try:
+            return pd.to_datetime(date_str, errors='coerce')
+        except Exception:
+            return None
+
+# Rapor kolonlarında baskın iki tarih biçimi; açık format verildiğinde
+# pandas eleman başına biçim çıkarımı yapmadan C parser'ına gider.
+DATE_FMT_HINTS = ("%Y-%m-%d", "%m/%d/%Y")
+
+
+def _parse_datetime_column(series: pd.Series) -> pd.Series:
+    for fmt in DATE_FMT_HINTS:
+        try:
+            return pd.to_datetime(series, format=fmt, errors="raise", cache=True)
+        except (ValueError, TypeError):
+            continue
+    return pd.to_datetime(series, errors="coerce", cache=True)
+
+
+# Parsed datetime columns, keyed per DataFrame instance. The same frame is
+# filtered on several date columns per request (and across requests while it
+# lives in a worker); parsing each column once is enough.
+_DT_CACHE: "weakref.WeakKeyDictionary[pd.DataFrame, dict]" = weakref.WeakKeyDictionary()
+
+
+def _datetime_values(df: pd.DataFrame, column: str) -> np.ndarray:
+    try:
+        cols = _DT_CACHE.get(df)
+        if cols is None:
+            cols = {}
+            _DT_CACHE[df] = cols
+    except TypeError:  # pragma: no cover - frame not weak-referenceable
+        cols = {}
+    values = cols.get(column)
+    if values is None:
+        values = _parse_datetime_column(df[column]).to_numpy()
+        cols[column] = values
+    return values
+
+
+def _mask_exact(df: pd.DataFrame, column: str, value, mask: np.ndarray) -> None:
+    """AND the equality condition for ``column`` into ``mask`` in place."""
+    col_dtype = df[column].dtype
+    try:
+        if pd.api.types.is_numeric_dtype(col_dtype):
+            value = float(value)
+            if _eq_mask_f64 is not None and col_dtype.kind == "f":
+                _eq_mask_f64(df[column].to_numpy(), value, mask)
+                return
+        elif pd.api.types.is_datetime64_any_dtype(col_dtype):
+            value = _parse_date(value)
+        np.logical_and(mask, (df[column] == value).to_numpy(), out=mask)
+    except Exception:
+        pass
+
+def _mask_date_range(df: pd.DataFrame, column: str, start_date: Optional[str], end_date: Optional[str], mask: np.ndarray) -> None:
+    """AND the date-range condition for ``column`` into ``mask`` in place."""
+    values = _datetime_values(df, column)
+    start = _parse_date(start_date)
+    end = _parse_date(end_date)
+
+    if not start and not end:
+        return
+
+    # Maske doğrudan numpy'da kurulur; pd.Series tabanlı &= zincirinin her
+    # adımda yaptığı ara Series tahsisleri ve index hizalaması yok.
+    if _date_range_mask_i8 is not None and values.dtype.kind == "M":
+        lo = np.datetime64(start, "ns").view("i8") if start else _I8_MIN
+        hi = np.datetime64(end, "ns").view("i8") if end else _I8_MAX
+        _date_range_mask_i8(values.view("i8"), lo, hi, mask)
+        return
+    if start:
+        np.logical_and(mask, values >= np.datetime64(start), out=mask)
+    if end:
+        np.logical_and(mask, values <= np.datetime64(end), out=mask)
+
+# _beg_date/_end_date anahtarları DATE_COLUMN_LIST'e göre sabittir;
+# her çağrıda yeniden kurmak yerine modül yüklenirken bir kez hesaplanır.
+_EXCLUDED_KEYS = frozenset(
+    f"{col.lower()}{suffix}" for col in DATE_COLUMN_LIST for suffix in ("_beg_date", "_end_date")
+)
+
+
+def apply_filters(df: pd.DataFrame, filters: dict) -> pd.DataFrame:
+    filters = {k.lower(): v for k, v in filters.items()}
+
+    # Tüm koşullar tek maskede toplanır, dilimleme en sonda bir kez yapılır;
+    # filtre başına ara DataFrame tahsis edilmez (df.copy() de gereksizleşir).
+    mask = np.ones(len(df), dtype=np.bool_)
+
+    # 1. DATE_COLUMN_LIST için [_beg_date, _end_date] kontrol et
+    for col in DATE_COLUMN_LIST:
+        col_lower = col.lower()
+        beg_key = f"{col_lower}_beg_date"
+        end_key = f"{col_lower}_end_date"
+        beg_val = filters.get(beg_key)
+        end_val = filters.get(end_key)
+        if beg_val or end_val:
+            if col in df.columns:
+                _mask_date_range(df, col, beg_val, end_val, mask)
+
+    # Diğer filtreleri doğrudan kolon adı eşleşmesiyle uygula; kolonlar bir
+    # kez küçük harfe indirilir, anahtar başına O(1) sözlük araması yapılır.
+    lower_to_col = {c.lower(): c for c in df.columns}
+    for key, value in filters.items():
+        if key in _EXCLUDED_KEYS:
+            continue
+        col = lower_to_col.get(key)
+        if col is not None:
+            _mask_exact(df, col, value, mask)
+
+    return df.iloc[mask]
\ No newline at end of file
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+"""Shared Redis client for the API blueprints and the cache refresher.
+
+The client is built once at import time - Python's import lock makes the
+initialization race-free, so callers pay no per-call factory check or lock
+the way an lru_cache'd accessor would. Both modules previously constructed
+identical pools; sharing one keeps the connection budget in a single place.
+"""
+import os
+
+import redis
+
+# Sınırlı BlockingConnectionPool: eşzamanlı worker'lar altında bağlantı
+# patlamasını önler; hiredis kuruluysa redis-py C parser'ını otomatik seçer.
+redis_client = redis.Redis(
+    connection_pool=redis.BlockingConnectionPool(
+        host=os.getenv("REDIS_HOST", "localhost"),
+        port=int(os.getenv("REDIS_PORT", 6379)),
+        db=int(os.getenv("REDIS_DB", 0)),
+        max_connections=int(os.getenv("REDIS_MAX_CONNECTIONS", 32)),
+        decode_responses=False,
+    ),
+)
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+"""JSON response helper backed by orjson when available.
+
+orjson serializes dict payloads several times faster than the stdlib json
+encoder used by flask.jsonify, which matters for the dossier-definition
+dumps returned by the discover endpoints and for large refresh summaries.
+"""
+from flask import Response, jsonify
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def json_response(payload, status: int = 200) -> Response:
+    """Serialize ``payload`` with orjson when installed, else flask.jsonify."""
+    if orjson is not None:
+        return Response(orjson.dumps(payload), status=status, mimetype="application/json")
+    response = jsonify(payload)
+    response.status_code = status
+    return response
@@ -1,12 +1,34 @@
-import unicodedata
-import re
-import json
-import pandas as pd
-from mstrio.project_objects import OlapCube
-from datetime import datetime
-import os
-import yaml
-
+import unicodedata
+import io
+import re
+import json
+import pickle
+import threading
+import time
+import numpy as np
+import pandas as pd
+from dateutil.parser import parse as dateutil_parse
+from functools import lru_cache
+from mstrio.project_objects import OlapCube
+from datetime import datetime
+import os
+import yaml
+
+try:
+    from yaml import CSafeDumper as SafeDumper, CSafeLoader as SafeLoader
+except ImportError:  # pragma: no cover - libyaml bindings unavailable
+    from yaml import SafeDumper, SafeLoader
+
+try:
+    import pyarrow.csv as pacsv
+except ImportError:  # pragma: no cover - optional dependency
+    pacsv = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
 BASE_DIR = os.path.dirname(__file__)
 CONFIG_PATH = os.path.join(BASE_DIR, "config", "dossiers.yaml")
 
@@ -14,23 +36,104 @@ CACHE_POLICY_NONE = "none"
 CACHE_POLICY_DAILY = "daily"
 
 
-def load_config():
+# Single-slot cache for the parsed dossiers.yaml, keyed on path + mtime.
+# Flask serves requests from multiple threads, hence the lock.
+_CFG_CACHE: dict = {"path": None, "mtime": None, "data": None}
+_CFG_CACHE_LOCK = threading.Lock()
+
+
+def load_yaml_config_cached(path):
+    """Parse a YAML config file, re-reading only when its mtime changes.
+
+    Repeated calls cost one stat plus a dict lookup instead of a full
+    YAML parse, which matters on the fetch path where the config is
+    consulted for every report request.
+    """
+    path = os.fspath(path)
+    mtime = os.stat(path).st_mtime_ns
+    with _CFG_CACHE_LOCK:
+        if _CFG_CACHE["path"] == path and _CFG_CACHE["mtime"] == mtime:
+            return _CFG_CACHE["data"]
+    with open(path, encoding="utf-8") as f:
+        data = yaml.load(f, Loader=SafeLoader)
+    with _CFG_CACHE_LOCK:
+        _CFG_CACHE.update(path=path, mtime=mtime, data=data)
+    return data
+
+
+def _config_paths() -> tuple:
     base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
     config_path = os.path.join(base_dir, "config", "dossiers.yaml")
+    return config_path, config_path[: -len(".yaml")] + ".pkl"
+
+
+def _write_config_pickle(pkl_path: str, config: dict) -> None:
+    """Best-effort refresh of the pickle sidecar; never fails the caller."""
+    try:
+        tmp_path = pkl_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(config, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, pkl_path)
+    except OSError:
+        pass
+
+
+def load_config():
+    config_path, pkl_path = _config_paths()
 
     if not os.path.exists(config_path):
-        raise FileNotFoundError(f"Config file not found at: {config_path}")
-
-    with open(config_path, encoding="utf-8") as f:
-        return yaml.safe_load(f)
-
-
-def save_config(config: dict) -> None:
-    import os, yaml
-    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-    config_path = os.path.join(base_dir, "config", "dossiers.yaml")
-    with open(config_path, "w", encoding="utf-8") as f:
-        yaml.safe_dump(config, f, allow_unicode=True, default_flow_style=False)
+        raise FileNotFoundError(f"Config file not found at: {config_path}")
+
+    # mtime değişmediyse son parse edilmiş sözlük aynen döner; ne yaml
+    # ne pickle okunur.
+    mtime = os.stat(config_path).st_mtime_ns
+    with _CFG_CACHE_LOCK:
+        if _CFG_CACHE["path"] == config_path and _CFG_CACHE["mtime"] == mtime:
+            return _CFG_CACHE["data"]
+
+    # Pickle sidecar: yaml parse yerine ~50x daha hizli yüklenir; yalnizca
+    # yaml'dan daha yeni (veya ayni yasta) ise güvenilir.
+    config = None
+    try:
+        if os.stat(pkl_path).st_mtime_ns >= mtime:
+            with open(pkl_path, "rb") as f:
+                config = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+
+    if config is None:
+        with open(config_path, encoding="utf-8") as f:
+            config = yaml.load(f, Loader=SafeLoader)
+        _write_config_pickle(pkl_path, config)
+
+    with _CFG_CACHE_LOCK:
+        _CFG_CACHE.update(path=config_path, mtime=mtime, data=config)
+    return config
+
+
+def save_config(config: dict) -> None:
+    config_path, pkl_path = _config_paths()
+    # tmp dosyasina yazip os.replace: eşzamanlı okuyucular asla yarım
+    # dosya görmez, mtime tabanlı cache'ler ara durum yakalamaz.
+    tmp_path = config_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        yaml.dump(config, f, Dumper=SafeDumper, allow_unicode=True, default_flow_style=False,
+                  sort_keys=False)
+    os.replace(tmp_path, config_path)
+    _write_config_pickle(pkl_path, config)
+
+
+def read_mstr_csv(content: bytes) -> pd.DataFrame:
+    """Parse a UTF-16 CSV export from the MSTR REST API into a DataFrame.
+
+    When pyarrow is installed the payload is re-encoded once to UTF-8 and
+    parsed by arrow's multithreaded C++ reader; otherwise pandas reads the
+    raw bytes directly.
+    """
+    if pacsv is not None:
+        utf8_bytes = content.decode("utf-16").encode("utf-8")
+        return pacsv.read_csv(io.BytesIO(utf8_bytes)).to_pandas()
+    return pd.read_csv(io.BytesIO(content), encoding="utf-16", low_memory=False)
 
 
 def resolve_cache_policy(cfg: dict) -> str:
@@ -60,82 +163,131 @@ def resolve_cache_policy(cfg: dict) -> str:
 
 
 def try_parse_date(s):
-    from dateutil.parser import parse
-    try:
-        return parse(s)
-    except:
-        return s
-
-
-def is_lower_camel_case(s: str) -> bool:
-    """Check if a string is in lowerCamelCase format."""
-    return s[0].islower() and any(c.isupper() for c in s[1:])
-
-
-def replace_turkish_characters(text: str) -> str:
-    replacements = {
-        "ç": "c", "Ç": "C",
-        "ğ": "g", "Ğ": "G",
-        "ı": "i", "I": "I",
-        "i": "i", "İ": "I",
-        "ö": "o", "Ö": "O",
-        "ş": "s", "Ş": "S",
-        "ü": "u", "Ü": "U"
-    }
-    for turkish, ascii in replacements.items():
-        text = text.replace(turkish, ascii)
-    return text
-
-def _to_camel_no_tr(s: str) -> str:
-    """Convert string to ASCII-only camelCase."""
-    s_norm = unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
-    parts = re.sub(r"[^0-9a-zA-Z]+", " ", s_norm).strip().split()
-    return parts[0].lower() + ''.join(p.title() for p in parts[1:]) if parts else ""
-
+    try:
+        return dateutil_parse(s)
+    except:
+        return s
+
+
+@lru_cache(maxsize=4096)
+def is_lower_camel_case(s: str) -> bool:
+    """Check if a string is in lowerCamelCase format."""
+    return s[0].islower() and any(c.isupper() for c in s[1:])
+
+
+# Precompiled tables for the Turkish-to-ASCII transforms; built once so the
+# per-call cost is a single C-level translate plus one compiled-regex
+# substitution instead of a chain of full-string .replace() scans.
+_TR_TABLE = str.maketrans("ığüşöçİĞÜŞÖÇ", "igusocIGUSOC")
+_NON_ALNUM_RE = re.compile(r"[^0-9a-zA-Z]+")
+
+
+@lru_cache(maxsize=4096)
+def replace_turkish_characters(text: str) -> str:
+    return text.translate(_TR_TABLE)
+
+
+@lru_cache(maxsize=4096)
+def _to_camel_no_tr(s: str) -> str:
+    """Convert string to ASCII-only camelCase."""
+    s_norm = s.translate(_TR_TABLE)
+    if not s_norm.isascii():
+        s_norm = unicodedata.normalize("NFKD", s_norm).encode("ascii", "ignore").decode("ascii")
+    parts = _NON_ALNUM_RE.sub(" ", s_norm).strip().split()
+    return parts[0].lower() + ''.join(p.title() for p in parts[1:]) if parts else ""
+
 def _stringify_dataframe(df: pd.DataFrame) -> pd.DataFrame:
-    """Convert all DataFrame values to strings and replace missing values with 'NULL'."""
-    return df.applymap(lambda value: "NULL" if pd.isna(value) else str(value))
+    """Convert all DataFrame values to strings and replace missing values with 'NULL'.
+
+    Works column by column on numpy arrays instead of applymap, which
+    dispatches a Python lambda per cell. Datetime columns are formatted in
+    bulk along the way, and the result is assembled as a fresh frame, so
+    callers do not need a defensive copy of the input.
+    """
+    out = pd.DataFrame(index=df.index)
+    for col, series in df.items():
+        if series.dtype.kind == "M":
+            values = _format_datetime_column(series)
+            mask = pd.isna(values)
+        else:
+            mask = series.isna().to_numpy()
+            values = series.to_numpy().astype(str).astype(object)
+        if mask.any():
+            values[mask] = "NULL"
+        out[col] = values
+    return out
+
+
+def _format_datetime_column(series: pd.Series) -> np.ndarray:
+    """Format a datetime column as 'YYYY-MM-DD HH:MM:SS' strings in bulk.
+
+    np.datetime_as_string formats the whole array in C; NaT positions are
+    reset to NaN so the stringify pass maps them to 'NULL' as before.
+    """
+    if getattr(series.dtype, "tz", None) is not None:
+        series = series.dt.tz_localize(None)
+    mask = series.isna().to_numpy()
+    arr = series.to_numpy().astype("datetime64[s]")
+    out = np.char.replace(np.datetime_as_string(arr, unit="s"), "T", " ").astype(object)
+    if mask.any():
+        out[mask] = np.nan
+    return out
+
+
+def _dumps_records(records) -> str:
+    """Encode a list of record dicts as pretty JSON, via orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(records, option=orjson.OPT_INDENT_2).decode("utf-8")
+    return json.dumps(records, ensure_ascii=False, indent=2)
 
 
 def dataframe_to_pretty_json(df: pd.DataFrame) -> str:
     """Convert DataFrame to pretty JSON with camelCase keys and missing→'NULL' and datetime→str."""
-    df2 = df.copy()
-    df2.columns = [_to_camel_no_tr(c) for c in df2.columns]
-    
-    for col in df2.select_dtypes(include=["datetime", "datetimetz"]).columns:
-        df2[col] = df2[col].dt.strftime("%Y-%m-%d %H:%M:%S")
-    df2 = _stringify_dataframe(df2)
-    return json.dumps(df2.to_dict(orient="records"), ensure_ascii=False, indent=2)
-
-
-def save_dataframe_to_json_file(df: pd.DataFrame, file_path: str) -> None:
-    """Save DataFrame as pretty JSON file."""
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write(dataframe_to_pretty_json(df))
-
-def get_cube_last_update_time(conn, cube_id: str) -> str:
-    """
-    OlapCube üzerinden zaman bilgisini alır, datetime objesine dönüştürür
-    ve 'YYYY-MM-DD HH:MM:SS' formatında döner.
-    """
+    # _stringify_dataframe returns a new frame (and formats datetimes), so
+    # the column rename happens on that frame - no upfront full-data copy.
+    df2 = _stringify_dataframe(df)
+    df2.columns = [_to_camel_no_tr(c) for c in df2.columns]
+    return _dumps_records(df2.to_dict(orient="records"))
+
+
+def save_dataframe_to_json_file(df: pd.DataFrame, file_path: str) -> None:
+    """Save DataFrame as pretty JSON file."""
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write(dataframe_to_pretty_json(df))
+
+# Küp zaman damgaları kısa TTL ile saklanır: her rapor isteğinde OlapCube
+# kurup MSTR'a gitmek yerine dakikada bir tazelenir.
+_CUBE_TS_TTL_S = 60.0
+_CUBE_TS_CACHE: dict = {}
+_CUBE_TS_LOCK = threading.Lock()
+
+
+def get_cube_last_update_time(conn, cube_id: str) -> str:
+    """
+    OlapCube üzerinden zaman bilgisini alır, datetime objesine dönüştürür
+    ve 'YYYY-MM-DD HH:MM:SS' formatında döner.
+    """
     if not cube_id:
         return "NULL"
-    
-    cube = OlapCube(connection=conn, id=cube_id)
-    t = cube.last_update_time
-
-    # Eğer zaten datetime objesi değilse, ISO string’i parse et
-    if not isinstance(t, datetime):
-        t = datetime.fromisoformat(t)
-    return t.strftime("%Y-%m-%d %H:%M:%S")
-
+
+    now = time.monotonic()
+    with _CUBE_TS_LOCK:
+        entry = _CUBE_TS_CACHE.get(cube_id)
+        if entry is not None and now - entry[0] < _CUBE_TS_TTL_S:
+            return entry[1]
+
+    cube = OlapCube(connection=conn, id=cube_id)
+    t = cube.last_update_time
+
+    # Eğer zaten datetime objesi değilse, ISO string’i parse et
+    if not isinstance(t, datetime):
+        t = datetime.fromisoformat(t)
+    formatted = t.strftime("%Y-%m-%d %H:%M:%S")
+
+    with _CUBE_TS_LOCK:
+        _CUBE_TS_CACHE[cube_id] = (now, formatted)
+    return formatted
+
 def safe_json_serialize(df: pd.DataFrame) -> str:
     """Safely convert DataFrame to JSON without renaming columns. Handles missing values and datetime."""
-    df2 = df.copy()
-
-    # Convert datetime columns to string
-    for col in df2.select_dtypes(include=["datetime", "datetimetz"]).columns:
-        df2[col] = df2[col].dt.strftime("%Y-%m-%d %H:%M:%S")
-
-    df2 = _stringify_dataframe(df2)
-    return json.dumps(df2.to_dict(orient="records"), ensure_ascii=False, indent=2)
+    return _dumps_records(_stringify_dataframe(df).to_dict(orient="records"))